@@ -1,12 +1,23 @@
 ## Import the needed libraries
+import argparse
+import functools
+import hashlib
 import json
+import re
+import sqlite3
+import threading
 import time
-from datetime import datetime
-from typing import Any, Optional
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Hashable, Iterable, NamedTuple, Optional, TypeVar
+import orjson
 import requests
 from decouple import config
 from loguru import logger
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util import Retry
 
 # Get environment variables using the config object or os.environ["KEY"]
 # These are the credentials passed by the variables of your pipeline to your tasks and in to your env
@@ -21,10 +32,28 @@ BITBUCKET_PROJECTS_FILTER = config(
 )
 PORT_API_URL =  config("PORT_API_URL", default="https://api.getport.io/v1")
 WEBHOOK_SECRET = config("WEBHOOK_SECRET", default="bitbucket_webhook_secret")
+MAX_CONCURRENT_REQUESTS = config("MAX_CONCURRENT_REQUESTS", cast=int, default=16)
+MAX_CONCURRENT_PROJECTS = config("MAX_CONCURRENT_PROJECTS", cast=int, default=8)
+STATE_DB_PATH = config("STATE_DB_PATH", default="state.db")
+WEBHOOK_CACHE_TTL = config("WEBHOOK_CACHE_TTL", cast=int, default=86400)
+
+# Set by --resume: skip entities whose content is unchanged since they were last synced
+resume_sync = False
 
 ## According to https://support.atlassian.com/bitbucket-cloud/docs/api-request-limits/
 RATE_LIMIT = 1000  # Maximum number of requests allowed per hour
 RATE_PERIOD = 3600  # Rate limit reset period in seconds (1 hour)
+RESPONSE_CACHE_MAX_SIZE = 10_000  # Maximum number of cached Bitbucket responses
+RESPONSE_CACHE_TTLS = {  # Seconds to reuse a response, by request path pattern. Other paths are not cached
+    r"/commits$": 5,
+    r"/README\.md$": 300,
+    r"^projects/[^/]+$": 30,
+    r"^projects/[^/]+/webhooks$": 30,
+}
+HTTP_POOL_SIZE = 64  # Keep-alive connections kept open per host by each session
+PORT_BULK_BATCH_SIZE = 20  # Maximum number of entities Port accepts per bulk request
+PORT_TOKEN_REFRESH_MARGIN = 60  # Refresh the Port access token this many seconds before it expires
+JSON_HEADERS = {"Content-Type": "application/json"}
 WEBHOOK_IDENTIFIER = "bitbucket_mapper"
 WEBHOOK_EVENTS = [
     "repo:modified",
@@ -44,31 +73,285 @@ WEBHOOK_EVENTS = [
     "pr:comment:added",
 ]
 
-# Initialize rate limiting variables
-request_count = 0
-rate_limit_start = time.time()
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiter, re-tuned from the rate limit headers Bitbucket returns."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate  # Tokens refilled per second
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.last_refill) * self.rate
+        )
+        self.last_refill = now
+
+    def acquire(self, tokens: float = 1):
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait_time = (tokens - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+    def update_from_headers(self, headers: dict[str, str]):
+        ## Bitbucket rate limit headers https://confluence.atlassian.com/bitbucketserver/improving-instance-stability-with-rate-limiting-976171954.html
+        limit = _parse_header_float(headers, "X-RateLimit-Limit")
+        remaining = _parse_header_float(headers, "X-RateLimit-Remaining")
+        fill_rate = _parse_header_float(headers, "X-RateLimit-FillRate")
+        interval = _parse_header_float(headers, "X-RateLimit-Interval-Seconds")
+
+        with self.lock:
+            self._refill()
+            if limit:
+                self.capacity = limit
+            if fill_rate and interval:
+                self.rate = fill_rate / interval
+            if remaining is not None:
+                self.tokens = min(self.capacity, remaining)
+
+
+class CachedResponse(NamedTuple):
+    payload: Any
+    expires_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of Bitbucket GET responses with per-endpoint TTLs.
+
+    Only paths matching a TTL policy are cached. Expired entries are kept while
+    they have ETag/Last-Modified validators to send with the next request; a 304
+    response then revives the payload. Expired entries without validators are dropped.
+    """
+
+    def __init__(self, maxsize: int, ttls: dict[str, float]):
+        self.maxsize = maxsize
+        self.ttls = {re.compile(pattern): ttl for pattern, ttl in ttls.items()}
+        self.entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def ttl_for(self, path: str) -> Optional[float]:
+        for pattern, ttl in self.ttls.items():
+            if pattern.search(path):
+                return ttl
+        return None
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if (
+                entry.expires_at <= time.monotonic()
+                and not entry.etag
+                and not entry.last_modified
+            ):
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, ttl: float, payload: Any, headers: dict[str, str]):
+        entry = CachedResponse(
+            payload=payload,
+            expires_at=time.monotonic() + ttl,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, url: str):
+        with self.lock:
+            for key in [key for key in self.entries if key[1] == url]:
+                del self.entries[key]
+
+
+def _parse_header_float(headers: dict[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# Initialize the rate limiter with the documented budget until Bitbucket tells us otherwise
+bitbucket_rate_limiter = TokenBucket(capacity=RATE_LIMIT, rate=RATE_LIMIT / RATE_PERIOD)
+response_cache = ResponseCache(
+    maxsize=RESPONSE_CACHE_MAX_SIZE,
+    ttls=RESPONSE_CACHE_TTLS,
+)
+
+
+def create_pooled_session() -> requests.Session:
+    """Create a session that reuses keep-alive connections and retries transient failures."""
+    # Retry rate limited and transient server errors with exponential backoff, honouring Retry-After.
+    # raise_on_status=False hands the last response back so raise_for_status() still reports it.
+    retry = Retry(
+        total=5,
+        backoff_factor=2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        # Wait for a pooled connection instead of opening throwaway sockets when all are busy
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+port_token_lock = threading.Lock()
+port_token_issued_at = 0.0
+port_token_expires_in = 0.0
+
+
+@functools.lru_cache(maxsize=1)
+def _port_session() -> requests.Session:
+    return create_pooled_session()
+
+
+def get_port_session() -> requests.Session:
+    """Return the shared Port session, fetching a new access token when the current one is about to expire."""
+    global port_token_issued_at, port_token_expires_in
+
+    session = _port_session()
+    with port_token_lock:
+        token_age = time.monotonic() - port_token_issued_at
+        if token_age > port_token_expires_in - PORT_TOKEN_REFRESH_MARGIN:
+            ## Get Port Access Token
+            credentials = {"clientId": PORT_CLIENT_ID, "clientSecret": PORT_CLIENT_SECRET}
+            token_response = requests.post(
+                f"{PORT_API_URL}/auth/access_token",
+                data=orjson.dumps(credentials),
+                headers=JSON_HEADERS,
+            )
+            token_response.raise_for_status()
+            token_json = orjson.loads(token_response.content)
+            session.headers["Authorization"] = f"Bearer {token_json['accessToken']}"
+            port_token_issued_at = time.monotonic()
+            port_token_expires_in = token_json.get("expiresIn", 3600)
+    return session
+
+
+state_db_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _state_db() -> sqlite3.Connection:
+    """Open the local state database that persists sync state across runs."""
+    connection = sqlite3.connect(STATE_DB_PATH, check_same_thread=False)
+    connection.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS project_webhooks (
+            project_key TEXT PRIMARY KEY,
+            webhook_url TEXT NOT NULL,
+            webhook TEXT NOT NULL,
+            cached_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS entity_sync_state (
+            blueprint TEXT NOT NULL,
+            state_key TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            synced_at REAL NOT NULL,
+            PRIMARY KEY (blueprint, state_key)
+        );
+        """
+    )
+    return connection
+
+
+def get_cached_project_webhook(
+    project_key: str, webhook_url: str
+) -> Optional[dict[str, Any]]:
+    with state_db_lock:
+        row = (
+            _state_db()
+            .execute(
+                "SELECT webhook FROM project_webhooks WHERE project_key = ? AND webhook_url = ? AND cached_at > ?",
+                (project_key, webhook_url, time.time() - WEBHOOK_CACHE_TTL),
+            )
+            .fetchone()
+        )
+    return json.loads(row[0]) if row else None
+
+
+def cache_project_webhook(project_key: str, webhook_url: str, webhook: dict[str, Any]):
+    with state_db_lock, _state_db() as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO project_webhooks VALUES (?, ?, ?, ?)",
+            (project_key, webhook_url, json.dumps(webhook), time.time()),
+        )
+
 
-## Get Port Access Token
-credentials = {"clientId": PORT_CLIENT_ID, "clientSecret": PORT_CLIENT_SECRET}
-token_response = requests.post(f"{PORT_API_URL}/auth/access_token", json=credentials)
-access_token = token_response.json()["accessToken"]
+def entity_fingerprint(entity: dict[str, Any]) -> str:
+    return hashlib.sha256(orjson.dumps(entity, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def get_synced_fingerprints(blueprint_id: str, state_keys: list[str]) -> dict[str, str]:
+    if not state_keys:
+        return {}
+    placeholders = ", ".join("?" for _ in state_keys)
+    with state_db_lock:
+        rows = (
+            _state_db()
+            .execute(
+                f"SELECT state_key, fingerprint FROM entity_sync_state WHERE blueprint = ? AND state_key IN ({placeholders})",
+                (blueprint_id, *state_keys),
+            )
+            .fetchall()
+        )
+    return dict(rows)
+
+
+def record_synced_entities(blueprint_id: str, fingerprints: dict[str, str]):
+    synced_at = time.time()
+    with state_db_lock, _state_db() as connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO entity_sync_state VALUES (?, ?, ?, ?)",
+            [
+                (blueprint_id, state_key, fingerprint, synced_at)
+                for state_key, fingerprint in fingerprints.items()
+            ],
+        )
 
-# You can now use the value in access_token when making further requests
-port_headers = {"Authorization": f"Bearer {access_token}"}
 
 ## Bitbucket user password https://developer.atlassian.com/server/bitbucket/how-tos/example-basic-authentication/
 bitbucket_auth = HTTPBasicAuth(username=BITBUCKET_USERNAME, password=BITBUCKET_PASSWORD)
 
+bitbucket_session = create_pooled_session()
+bitbucket_session.auth = bitbucket_auth
+
 
 def get_or_create_port_webhook():
     logger.info("Checking if a Bitbucket webhook is configured on Port...")
     try:
-        response = requests.get(
+        response = get_port_session().get(
             f"{PORT_API_URL}/webhooks/{WEBHOOK_IDENTIFIER}",
-            headers=port_headers,
         )
         response.raise_for_status()
-        webhook_url = response.json().get("integration", {}).get("url")
+        webhook_url = (
+            orjson.loads(response.content).get("integration", {}).get("url")
+        )
         logger.info(f"Webhook configuration exists in port. URL: {webhook_url}")
         return webhook_url
     except requests.exceptions.HTTPError as e:
@@ -80,10 +363,15 @@ def get_or_create_port_webhook():
             return None
 
 
+@functools.lru_cache(maxsize=1)
+def load_webhook_mappings() -> list[dict[str, Any]]:
+    with open("./resources/webhook_configuration.json", "r") as file:
+        return json.load(file)
+
+
 def create_port_webhook():
     logger.info("Creating a webhook for bitbucket on Port...")
-    with open("./resources/webhook_configuration.json", "r") as file:
-        mappings = json.load(file)
+    mappings = load_webhook_mappings()
     webhook_data = {
         "identifier": WEBHOOK_IDENTIFIER,
         "title": "Bitbucket Webhook",
@@ -102,13 +390,15 @@ def create_port_webhook():
     }
 
     try:
-        response = requests.post(
+        response = get_port_session().post(
             f"{PORT_API_URL}/webhooks",
-            json=webhook_data,
-            headers=port_headers,
+            data=orjson.dumps(webhook_data),
+            headers=JSON_HEADERS,
         )
         response.raise_for_status()
-        webhook_url = response.json().get("integration", {}).get("url")
+        webhook_url = (
+            orjson.loads(response.content).get("integration", {}).get("url")
+        )
         logger.info(
             f"Webhook configuration successfully created in Port: {webhook_url}"
         )
@@ -126,6 +416,12 @@ def get_or_create_project_webhook(
 ):
     logger.info(f"Checking webhooks for project: {project_key}")
     if webhook_url is not None:
+        cached_webhook = get_cached_project_webhook(
+            project_key=project_key, webhook_url=webhook_url
+        )
+        if cached_webhook:
+            logger.info(f"Webhook already exists for project {project_key} (cached)")
+            return cached_webhook
         try:
             matching_webhooks = [
                 webhook
@@ -137,13 +433,19 @@ def get_or_create_project_webhook(
             ]
             if matching_webhooks:
                 logger.info(f"Webhook already exists for project {project_key}")
-                return matching_webhooks[0]
-            logger.info(
-                f"Webhook not found for project {project_key}. Creating a new one."
-            )
-            return create_project_webhook(
-                project_key=project_key, webhook_url=webhook_url, events=events
-            )
+                webhook = matching_webhooks[0]
+            else:
+                logger.info(
+                    f"Webhook not found for project {project_key}. Creating a new one."
+                )
+                webhook = create_project_webhook(
+                    project_key=project_key, webhook_url=webhook_url, events=events
+                )
+            if webhook:
+                cache_project_webhook(
+                    project_key=project_key, webhook_url=webhook_url, webhook=webhook
+                )
+            return webhook
         except requests.exceptions.HTTPError as e:
             logger.error(
                 f"HTTP error when checking webhooks for project {project_key}: {e.response.status_code}"
@@ -167,15 +469,15 @@ def create_project_webhook(project_key: str, webhook_url: str, events: list[str]
             "createdBy": "Port",
         },
     }
+    webhooks_url = f"{BITBUCKET_API_URL}/rest/api/1.0/projects/{project_key}/webhooks"
     try:
-        response = requests.post(
-            f"{BITBUCKET_API_URL}/rest/api/1.0/projects/{project_key}/webhooks",
-            json=webhook_data,
-            auth=bitbucket_auth,
+        response = bitbucket_session.post(
+            webhooks_url, data=orjson.dumps(webhook_data), headers=JSON_HEADERS
         )
         response.raise_for_status()
+        response_cache.invalidate(webhooks_url)
         logger.info(f"Successfully created webhook for project {project_key}")
-        return response.json()
+        return orjson.loads(response.content)
     except requests.exceptions.HTTPError as e:
         logger.error(
             f"HTTP error when creating webhook for project {project_key}: {e.response.status_code}"
@@ -183,13 +485,70 @@ def create_project_webhook(project_key: str, webhook_url: str, events: list[str]
         return None
 
 
-def add_entity_to_port(blueprint_id, entity_object):
-    response = requests.post(
-        f"{PORT_API_URL}/blueprints/{blueprint_id}/entities?upsert=true&merge=true",
-        json=entity_object,
-        headers=port_headers,
+def add_entities_bulk(blueprint_id: str, entities: list[dict[str, Any]]) -> list[str]:
+    """Upsert a batch of entities, returning the identifiers Port accepted."""
+    response = get_port_session().post(
+        f"{PORT_API_URL}/blueprints/{blueprint_id}/entities/bulk?upsert=true&merge=true",
+        data=orjson.dumps({"entities": entities}),
+        headers=JSON_HEADERS,
     )
-    logger.info(response.json())
+    if not response.ok:
+        logger.error(
+            f"Error upserting {len(entities)} {blueprint_id} entities: {response.status_code}, content: {response.text}"
+        )
+        return []
+
+    response_json = orjson.loads(response.content)
+    for error in response_json.get("errors", []):
+        logger.error(f"Error upserting {blueprint_id} entity: {error}")
+    upserted_identifiers = [
+        entity["identifier"] for entity in response_json.get("entities", [])
+    ]
+    logger.debug(f"upserted {len(upserted_identifiers)} {blueprint_id} entities")
+    return upserted_identifiers
+
+
+def get_bitbucket_resource(
+    path: str, params: dict[str, Any] = None, raw: bool = False
+) -> Any:
+    """GET a Bitbucket resource, returning the decoded JSON body, or the text body when raw is set."""
+    url = f"{BITBUCKET_API_URL}/rest/api/1.0/{path}"
+    params = params or {}
+    cache_key = ("GET", url, frozenset(params.items()))
+    cache_ttl = response_cache.ttl_for(path)
+
+    cached = response_cache.get(cache_key) if cache_ttl is not None else None
+    if cached and cached.expires_at > time.monotonic():
+        return cached.payload
+
+    # Revalidate stale entries so unchanged resources come back as an empty 304
+    headers = {}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+
+    bitbucket_rate_limiter.acquire()
+    response = bitbucket_session.get(url=url, params=params, headers=headers)
+    bitbucket_rate_limiter.update_from_headers(response.headers)
+
+    if cached and response.status_code == 304:
+        validators = {
+            "ETag": response.headers.get("ETag", cached.etag),
+            "Last-Modified": response.headers.get("Last-Modified", cached.last_modified),
+        }
+        response_cache.set(cache_key, cache_ttl, cached.payload, validators)
+        return cached.payload
+
+    response.raise_for_status()
+    if raw:
+        # Bitbucket serves raw files without a charset, which requests would decode as ISO-8859-1
+        payload = response.content.decode("utf-8", errors="replace")
+    else:
+        payload = orjson.loads(response.content)
+    if cache_ttl is not None:
+        response_cache.set(cache_key, cache_ttl, payload, response.headers)
+    return payload
 
 
 def get_paginated_resource(
@@ -200,22 +559,8 @@ def get_paginated_resource(
 ):
     logger.info(f"Requesting data for {path}")
 
-    global request_count, rate_limit_start
-
-    # Check if we've exceeded the rate limit, and if so, wait until the reset period is over
-    if request_count >= RATE_LIMIT:
-        elapsed_time = time.time() - rate_limit_start
-        if elapsed_time < RATE_PERIOD:
-            sleep_time = RATE_PERIOD - elapsed_time
-            time.sleep(sleep_time)
-
-        # Reset the rate limiting variables
-        request_count = 0
-        rate_limit_start = time.time()
-
-    url = f"{BITBUCKET_API_URL}/rest/api/1.0/{path}"
-    params = params or {}
-    params["limit"] = page_size
+    # Copy the params so callers sharing a dict across threads don't see our paging keys
+    params = {**(params or {}), "limit": page_size}
     next_page_start = None
 
     while True:
@@ -223,10 +568,7 @@ def get_paginated_resource(
             if next_page_start:
                 params["start"] = next_page_start
 
-            response = requests.get(url=url, auth=bitbucket_auth, params=params)
-            response.raise_for_status()
-            page_json = response.json()
-            request_count += 1
+            page_json = get_bitbucket_resource(path=path, params=params)
 
             if full_response:
                 yield page_json
@@ -254,141 +596,210 @@ def get_paginated_resource(
     logger.info(f"Successfully fetched paginated data for {path}")
 
 
+def run_concurrently(func: Callable[[T], R], items: Iterable[T]) -> list[R]:
+    """Apply func to every item on a bounded thread pool, preserving the input order."""
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        return list(executor.map(func, items))
+
+
 def get_single_project(project_key: str):
-    response = requests.get(
-        f"{BITBUCKET_API_URL}/rest/api/1.0/projects/{project_key}", auth=bitbucket_auth
-    )
-    response.raise_for_status()
-    return response.json()
+    return get_bitbucket_resource(path=f"projects/{project_key}")
 
 
 def convert_to_datetime(timestamp: int):
-    converted_datetime = datetime.utcfromtimestamp(timestamp / 1000.0)
-    return converted_datetime.strftime("%Y-%m-%dT%H:%M:%SZ")
-
+    # Format the fields directly, avoiding a datetime object and the strftime call per timestamp
+    year, month, day, hour, minute, second = time.gmtime(timestamp // 1000)[:6]
+    return f"{year:04d}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}:{second:02d}Z"
+
+
+def build_user_entity(user: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "identifier": user["emailAddress"],
+        "title": user["displayName"],
+        "properties": {
+            "username": user["name"],
+            "url": user["links"]["self"][0]["href"],
+        },
+        "relations": {},
+    }
 
-def parse_repository_file_response(file_response: dict[str, Any]) -> str:
-    lines = file_response.get("lines", [])
-    logger.info(f"Received readme file with {len(lines)} entries")
-    readme_content = ""
 
-    for line in lines:
-        readme_content += line.get("text", "") + "\n"
+def build_project_entity(project: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "identifier": project["key"],
+        "title": project["name"],
+        "properties": {
+            "description": project.get("description"),
+            "public": project["public"],
+            "type": project["type"],
+            "link": project["links"]["self"][0]["href"],
+        },
+        "relations": {},
+    }
 
-    return readme_content
 
+def build_repository_entity(repo: dict[str, Any]) -> dict[str, Any]:
+    slug = repo["slug"]
+    return {
+        "identifier": slug,
+        "title": repo["name"],
+        "properties": {
+            "description": repo.get("description"),
+            "state": repo["state"],
+            "forkable": repo["forkable"],
+            "public": repo["public"],
+            "link": repo["links"]["self"][0]["href"],
+            "documentation": repo.get("__readme", ""),
+            "swagger_url": f"https://api.{slug}.com",
+        },
+        "relations": dict(
+            project=repo["project"]["key"],
+            latestCommitAuthor=repo.get("__latestCommit", {})
+            .get("committer", {})
+            .get("emailAddress"),
+        ),
+    }
 
-def process_user_entities(users_data: list[dict[str, Any]]):
-    blueprint_id = "bitbucketUser"
 
-    for user in users_data:
-        entity = {
-            "identifier": user["emailAddress"],
-            "title": user["displayName"],
-            "properties": {
-                "username": user["name"],
-                "url": user["links"]["self"][0]["href"],
-            },
-            "relations": {},
-        }
-        add_entity_to_port(blueprint_id=blueprint_id, entity_object=entity)
-
-
-def process_project_entities(projects_data: list[dict[str, Any]]):
-    blueprint_id = "bitbucketProject"
-
-    for project in projects_data:
-        entity = {
-            "identifier": project["key"],
-            "title": project["name"],
-            "properties": {
-                "description": project.get("description"),
-                "public": project["public"],
-                "type": project["type"],
-                "link": project["links"]["self"][0]["href"],
-            },
-            "relations": {},
-        }
-        add_entity_to_port(blueprint_id=blueprint_id, entity_object=entity)
+def build_pullrequest_entity(pr: dict[str, Any]) -> dict[str, Any]:
+    from_ref = pr["fromRef"]
+    to_ref = pr["toRef"]
+    author_user = pr["author"]["user"]
+    return {
+        "identifier": str(pr["id"]),
+        "title": pr["title"],
+        "properties": {
+            "created_on": convert_to_datetime(pr["createdDate"]),
+            "updated_on": convert_to_datetime(pr["updatedDate"]),
+            "merge_commit": from_ref["latestCommit"],
+            "description": pr.get("description"),
+            "state": pr["state"],
+            "owner": author_user["displayName"],
+            "link": pr["links"]["self"][0]["href"],
+            "destination": to_ref["displayId"],
+            "reviewers": [
+                user["user"]["displayName"] for user in pr.get("reviewers", [])
+            ],
+            "source": from_ref["displayId"],
+        },
+        "relations": {
+            "repository": to_ref["repository"]["slug"],
+            "participants": [author_user["emailAddress"]]
+            + [user["user"]["emailAddress"] for user in pr.get("participants", [])],
+        },
+    }
 
 
-def process_repository_entities(repository_data: list[dict[str, Any]]):
-    blueprint_id = "bitbucketRepository"
+# Maps each blueprint to the function projecting a Bitbucket resource onto its entity
+ENTITY_BUILDERS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "bitbucketUser": build_user_entity,
+    "bitbucketProject": build_project_entity,
+    "bitbucketRepository": build_repository_entity,
+    "bitbucketPullrequest": build_pullrequest_entity,
+}
+
+
+# Maps each blueprint to a key that is unique in Bitbucket, used to track sync state.
+# Port identifiers are not enough: pull request ids repeat across repositories and
+# repository slugs repeat across projects.
+STATE_KEY_BUILDERS: dict[str, Callable[[dict[str, Any]], str]] = {
+    "bitbucketUser": lambda user: user["slug"],
+    "bitbucketProject": lambda project: project["key"],
+    "bitbucketRepository": lambda repo: f"{repo['project']['key']}/{repo['slug']}",
+    "bitbucketPullrequest": lambda pr: "{}/{}/{}".format(
+        pr["toRef"]["repository"]["project"]["key"],
+        pr["toRef"]["repository"]["slug"],
+        pr["id"],
+    ),
+}
+
+
+def upsert_entity_batch(
+    blueprint_id: str, keyed_entities: list[tuple[str, dict[str, Any]]]
+):
+    fingerprints = {
+        state_key: entity_fingerprint(entity) for state_key, entity in keyed_entities
+    }
 
-    for repo in repository_data:
-        readme_content = get_repository_readme(
-            project_key=repo["project"]["key"], repo_slug=repo["slug"]
+    if resume_sync:
+        synced_fingerprints = get_synced_fingerprints(
+            blueprint_id=blueprint_id, state_keys=list(fingerprints)
         )
-        entity = {
-            "identifier": repo["slug"],
-            "title": repo["name"],
-            "properties": {
-                "description": repo.get("description"),
-                "state": repo["state"],
-                "forkable": repo["forkable"],
-                "public": repo["public"],
-                "link": repo["links"]["self"][0]["href"],
-                "documentation": readme_content,
-                "swagger_url": f"https://api.{repo['slug']}.com",
-            },
-            "relations": dict(
-                project=repo["project"]["key"],
-                latestCommitAuthor=repo.get("__latestCommit", {})
-                .get("committer", {})
-                .get("emailAddress"),
-            ),
-        }
-        add_entity_to_port(blueprint_id=blueprint_id, entity_object=entity)
-
-
-def process_pullrequest_entities(pullrequest_data: list[dict[str, Any]]):
-    blueprint_id = "bitbucketPullrequest"
-
-    for pr in pullrequest_data:
-        entity = {
-            "identifier": str(pr["id"]),
-            "title": pr["title"],
-            "properties": {
-                "created_on": convert_to_datetime(pr["createdDate"]),
-                "updated_on": convert_to_datetime(pr["updatedDate"]),
-                "merge_commit": pr["fromRef"]["latestCommit"],
-                "description": pr.get("description"),
-                "state": pr["state"],
-                "owner": pr["author"]["user"]["displayName"],
-                "link": pr["links"]["self"][0]["href"],
-                "destination": pr["toRef"]["displayId"],
-                "reviewers": [
-                    user["user"]["displayName"] for user in pr.get("reviewers", [])
-                ],
-                "source": pr["fromRef"]["displayId"],
-            },
-            "relations": {
-                "repository": pr["toRef"]["repository"]["slug"],
-                "participants": [pr.get("author")["user"]["emailAddress"]]
-                + [user["user"]["emailAddress"] for user in pr.get("participants", [])],
-            },
-        }
-        add_entity_to_port(blueprint_id=blueprint_id, entity_object=entity)
+        changed_entities = [
+            (state_key, entity)
+            for state_key, entity in keyed_entities
+            if synced_fingerprints.get(state_key) != fingerprints[state_key]
+        ]
+        if len(changed_entities) < len(keyed_entities):
+            logger.info(
+                f"Skipping {len(keyed_entities) - len(changed_entities)} unchanged {blueprint_id} entities"
+            )
+        keyed_entities = changed_entities
+        if not keyed_entities:
+            return
+
+    upserted_identifiers = set(
+        add_entities_bulk(
+            blueprint_id=blueprint_id,
+            entities=[entity for _, entity in keyed_entities],
+        )
+    )
+    record_synced_entities(
+        blueprint_id=blueprint_id,
+        fingerprints={
+            state_key: fingerprints[state_key]
+            for state_key, entity in keyed_entities
+            if entity["identifier"] in upserted_identifiers
+        },
+    )
+
+
+def process_entities(blueprint_id: str, resources: Iterable[dict[str, Any]]):
+    """Stream resources through the blueprint's builder, uploading a bulk request every PORT_BULK_BATCH_SIZE entities."""
+    build_entity = ENTITY_BUILDERS[blueprint_id]
+    build_state_key = STATE_KEY_BUILDERS[blueprint_id]
+    keyed_entities = (
+        (build_state_key(resource), build_entity(resource)) for resource in resources
+    )
+    while entity_batch := list(islice(keyed_entities, PORT_BULK_BATCH_SIZE)):
+        upsert_entity_batch(blueprint_id=blueprint_id, keyed_entities=entity_batch)
+
+
+def process_user_entities(users_data: Iterable[dict[str, Any]]):
+    process_entities(blueprint_id="bitbucketUser", resources=users_data)
+
+
+def process_project_entities(projects_data: Iterable[dict[str, Any]]):
+    process_entities(blueprint_id="bitbucketProject", resources=projects_data)
+
+
+def process_repository_entities(repository_data: Iterable[dict[str, Any]]):
+    process_entities(blueprint_id="bitbucketRepository", resources=repository_data)
+
+
+def process_pullrequest_entities(pullrequest_data: Iterable[dict[str, Any]]):
+    process_entities(blueprint_id="bitbucketPullrequest", resources=pullrequest_data)
 
 
 def get_repository_readme(project_key: str, repo_slug: str) -> str:
-    file_path = f"projects/{project_key}/repos/{repo_slug}/browse/README.md"
-    readme_content = ""
-    for readme_file_batch in get_paginated_resource(
-        path=file_path, page_size=500, full_response=True
-    ):
-        file_content = parse_repository_file_response(readme_file_batch)
-        readme_content += file_content
-    return readme_content
+    ## The raw endpoint returns the whole file in one request, unlike the paginated browse endpoint
+    file_path = f"projects/{project_key}/repos/{repo_slug}/raw/README.md"
+    try:
+        return get_bitbucket_resource(path=file_path, raw=True)
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code == 404:
+            logger.info(f"No README.md found for repo {repo_slug}")
+            return ""
+        raise
 
 
 def get_latest_commit(project_key: str, repo_slug: str) -> dict[str, Any]:
     try:
         commit_path = f"projects/{project_key}/repos/{repo_slug}/commits"
-        for commit_batch in get_paginated_resource(path=commit_path, page_size=1):
-            if commit_batch:
-                latest_commit = commit_batch[0]
-                return latest_commit
+        commits_page = get_bitbucket_resource(path=commit_path, params={"limit": 1})
+        commits = commits_page.get("values", [])
+        if commits:
+            return commits[0]
     except Exception as e:
         logger.error(f"Error fetching latest commit for repo {repo_slug}: {e}")
     return {}
@@ -400,24 +811,37 @@ def get_repositories(project: dict[str, Any]):
         logger.info(
             f"received repositories batch with size {len(repositories_batch)} from project: {project['key']}"
         )
-        process_repository_entities(
-            repository_data=[
-                {
-                    **repo,
-                    "__latestCommit": get_latest_commit(
-                        project_key=project["key"], repo_slug=repo["slug"]
-                    ),
-                }
-                for repo in repositories_batch
-            ]
-        )
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            # Both maps are submitted up front, so commit and readme requests overlap
+            latest_commits = executor.map(
+                lambda repo: get_latest_commit(
+                    project_key=project["key"], repo_slug=repo["slug"]
+                ),
+                repositories_batch,
+            )
+            readmes = executor.map(
+                lambda repo: get_repository_readme(
+                    project_key=project["key"], repo_slug=repo["slug"]
+                ),
+                repositories_batch,
+            )
+            # Entities are built and uploaded as each repository's requests complete
+            process_repository_entities(
+                repository_data=(
+                    {**repo, "__latestCommit": latest_commit, "__readme": readme}
+                    for repo, latest_commit, readme in zip(
+                        repositories_batch, latest_commits, readmes
+                    )
+                )
+            )
 
         get_repository_pull_requests(repository_batch=repositories_batch)
 
 
 def get_repository_pull_requests(repository_batch: list[dict[str, Any]]):
     pr_params = {"state": "ALL"}  ## Fetch all pull requests
-    for repository in repository_batch:
+
+    def iter_repository_pull_requests(repository: dict[str, Any]):
         pull_requests_path = f"projects/{repository['project']['key']}/repos/{repository['slug']}/pull-requests"
         for pull_requests_batch in get_paginated_resource(
             path=pull_requests_path, params=pr_params
@@ -425,10 +849,35 @@ def get_repository_pull_requests(repository_batch: list[dict[str, Any]]):
             logger.info(
                 f"received pull requests batch with size {len(pull_requests_batch)} from repo: {repository['slug']}"
             )
-            process_pullrequest_entities(pullrequest_data=pull_requests_batch)
+            yield from pull_requests_batch
+
+    def process_repository_pull_requests(repository: dict[str, Any]):
+        # Stream across pages so bulk uploads stay full instead of splitting at page boundaries
+        process_pullrequest_entities(
+            pullrequest_data=iter_repository_pull_requests(repository)
+        )
+
+    run_concurrently(process_repository_pull_requests, repository_batch)
+
+
+def sync_project(project: dict[str, Any], webhook_url: Optional[str]):
+    get_repositories(project=project)
+    get_or_create_project_webhook(
+        project_key=project["key"],
+        webhook_url=webhook_url,
+        events=WEBHOOK_EVENTS,
+    )
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest Bitbucket resources into Port")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip entities that are unchanged since they were last synced to Port",
+    )
+    resume_sync = parser.parse_args().resume
+
     logger.info("Starting Bitbucket data extraction")
     for users_batch in get_paginated_resource(path="admin/users"):
         logger.info(f"received users batch with size {len(users_batch)}")
@@ -441,15 +890,20 @@ if __name__ == "__main__":
     port_webhook_url = get_or_create_port_webhook()
     if not port_webhook_url:
         logger.error("Failed to get or create Port webhook. Skipping webhook setup...")
-    for projects_batch in projects:
-        logger.info(f"received projects batch with size {len(projects_batch)}")
-        process_project_entities(projects_data=projects_batch)
-
-        for project in projects_batch:
-            get_repositories(project=project)
-            webhooks = get_or_create_project_webhook(
-                project_key=project["key"],
-                webhook_url=port_webhook_url,
-                events=WEBHOOK_EVENTS,
-            )
+    ## Projects are independent, so they are synced concurrently. All workers share the
+    ## Bitbucket rate limiter and connection pools.
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PROJECTS) as executor:
+        for projects_batch in projects:
+            logger.info(f"received projects batch with size {len(projects_batch)}")
+            process_project_entities(projects_data=projects_batch)
+
+            project_futures = [
+                executor.submit(
+                    sync_project, project=project, webhook_url=port_webhook_url
+                )
+                for project in projects_batch
+            ]
+            wait(project_futures)
+            for future in project_futures:
+                future.result()  # Re-raise any error from the project's worker
     logger.info("Bitbucket data extraction completed")